@@ -8,32 +8,114 @@
 import sqlite3
 import threading
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from config.db_config import CENTRAL_DB_PATH
+from config import db_config
 
 
 class CentralDB:
     """
     Singleton-совместимый класс для работы с центральной БД.
-    Потокобезопасен за счёт локального подключения в каждом методе.
+    Каждый поток работает через своё подключение; close() и shutdown()
+    вызываются только при завершении работы.
+    db_path может быть URI SQLite, например "file:test?mode=memory&cache=shared".
+    Такую БД удерживает отдельное подключение: данные переживают close() и
+    enable_fast_writes() и теряются только после shutdown().
     """
 
+    # Ускоренная запись — только для тестов: у WAL другая семантика при сбое
+    FAST_WRITE_PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA mmap_size=268435456",
+    )
+
     def __init__(self, db_path: Path = None):
-        self.db_path = db_path or CENTRAL_DB_PATH
+        # Путь читается из db_config в момент создания, а не при импорте модуля
+        self.db_path = db_path or db_config.CENTRAL_DB_PATH
+        db_path = str(self.db_path)
+        if db_path == ":memory:":
+            # У каждого потока была бы своя пустая БД
+            raise ValueError('Используйте "file:<имя>?mode=memory&cache=shared" вместо ":memory:"')
+        # Общая БД в памяти удаляется вместе с последним подключением — держим своё
+        self._keeper: Optional[sqlite3.Connection] = None
+        if db_path.startswith("file:") and "mode=memory" in db_path:
+            self._keeper = sqlite3.connect(db_path, uri=True, check_same_thread=False)
+        self._pragmas: Tuple[str, ...] = ()
+        self._lock = threading.Lock()
+        # Подключение каждого потока; подключения завершившихся потоков закрываются
+        self._connections: Dict[threading.Thread, sqlite3.Connection] = {}
         self._init_db()
 
     def _get_connection(self) -> sqlite3.Connection:
-        """Создаёт новое подключение к БД (потокобезопасно)."""
-        # check_same_thread=False безопасно, т.к. соединение локальное для метода
+        """
+        Возвращает подключение текущего потока, открывая его при первом обращении.
+        Подключение живёт между вызовами, поэтому кэш подготовленных выражений
+        sqlite3 не теряется. `with conn:` по-прежнему задаёт транзакцию.
+        """
+        thread = threading.current_thread()
+        conn = self._connections.get(thread)
+        if conn is not None:
+            return conn
+
+        # check_same_thread=False — чтобы закрыть подключение можно было из другого потока
+        db_path = str(self.db_path)
         conn = sqlite3.connect(
-            self.db_path,
+            db_path,
             timeout=30,
-            check_same_thread=False
+            check_same_thread=False,
+            uri=db_path.startswith("file:")
         )
         conn.row_factory = sqlite3.Row  # доступ по имени колонки
+        conn.execute("PRAGMA cache_size=-64000")  # 64 МБ страничного кэша
+        for pragma in self._pragmas:
+            conn.execute(pragma)
+
+        with self._lock:
+            self._prune_dead_threads()
+            self._connections[thread] = conn
         return conn
 
+    def _prune_dead_threads(self) -> None:
+        """Закрывает подключения завершившихся потоков (вызывается под self._lock)."""
+        for thread in [t for t in self._connections if not t.is_alive()]:
+            self._connections.pop(thread).close()
+
+    def close(self) -> None:
+        """
+        Закрывает подключения всех потоков — только при завершении работы:
+        подключение, которым в этот момент пользуется другой поток, тоже закроется.
+        Следующий вызов откроет новое подключение; БД в памяти при этом
+        сохраняется (см. shutdown()).
+        """
+        with self._lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+
+    def shutdown(self) -> None:
+        """Окончательное завершение: close() и закрытие БД в памяти (данные теряются)."""
+        self.close()
+        if self._keeper is not None:
+            self._keeper.close()
+            self._keeper = None
+
+    def enable_fast_writes(self, enabled: bool = True, synchronous: str = "NORMAL") -> None:
+        """
+        Включает WAL и заданный synchronous (только для тестов).
+        synchronous="OFF" — для одноразовых БД: COMMIT вообще без fsync.
+        При выключении журнал возвращается в режим DELETE.
+        """
+        if synchronous not in ("OFF", "NORMAL", "FULL"):
+            raise ValueError(f"Недопустимое значение synchronous: {synchronous}")
+        # Прагмы применяются при открытии, поэтому переоткрываем подключения
+        self.close()
+        if enabled:
+            self._pragmas = self.FAST_WRITE_PRAGMAS + (f"PRAGMA synchronous={synchronous}",)
+            return
+        self._pragmas = ()
+        self._get_connection().execute("PRAGMA journal_mode=DELETE")
+
     def _init_db(self):
         """Инициализирует таблицы при первом запуске."""
         with self._get_connection() as conn:
@@ -117,6 +199,41 @@ class CentralDB:
                 (user_id, location_id, display_name, lat, lon, is_default)
             )
 
+    def add_locations_bulk(
+        self,
+        user_id: int,
+        rows: List[Tuple[str, str, float, float]]
+    ) -> None:
+        """
+        Добавляет несколько локаций одной транзакцией.
+        rows — кортежи (location_id, display_name, lat, lon).
+        Если у пользователя ещё нет локаций, первая из добавленных становится текущей.
+        """
+        if not rows:
+            return
+        with self._get_connection() as conn:
+            existing_count = conn.execute(
+                "SELECT COUNT(*) FROM user_locations WHERE user_id = ?",
+                (user_id,)
+            ).fetchone()[0]
+
+            params = [
+                (user_id, location_id, display_name, lat, lon, existing_count == 0 and i == 0)
+                for i, (location_id, display_name, lat, lon) in enumerate(rows)
+            ]
+            # is_default при конфликте не трогаем — текущая локация остаётся прежней
+            conn.executemany(
+                """
+                INSERT INTO user_locations
+                (user_id, location_id, display_name, lat, lon, is_default)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(user_id, location_id) DO UPDATE SET
+                    display_name = excluded.display_name,
+                    lat = excluded.lat,
+                    lon = excluded.lon
+                """,
+                params
+            )
 
     def get_default_location(self, user_id: int) -> Optional[dict]:
         """
@@ -134,6 +251,40 @@ class CentralDB:
 
             return dict(row) if row else None
 
+    def get_location(self, user_id: int, location_id: str) -> Optional[dict]:
+        """
+        Возвращает одну локацию пользователя или None.
+        Поиск идёт по уникальному индексу (user_id, location_id).
+        """
+        with self._get_connection() as conn:
+            row = conn.execute(
+                """
+                SELECT id, location_id, display_name, lat, lon, is_default
+                FROM user_locations
+                WHERE user_id = ? AND location_id = ?
+                LIMIT 1
+                """,
+                (user_id, location_id)
+            ).fetchone()
+
+            return dict(row) if row else None
+
+    def count_locations(self, user_id: int) -> int:
+        """Возвращает количество локаций пользователя."""
+        with self._get_connection() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM user_locations WHERE user_id = ?",
+                (user_id,)
+            ).fetchone()[0]
+
+    def count_defaults(self, user_id: int) -> int:
+        """Возвращает количество локаций по умолчанию (в норме 0 или 1)."""
+        with self._get_connection() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM user_locations WHERE user_id = ? AND is_default = 1",
+                (user_id,)
+            ).fetchone()[0]
+
     def get_user_locations(self, user_id: int) -> List[dict]:
         """Возвращает все локации пользователя."""
         with self._get_connection() as conn:
@@ -197,4 +348,12 @@ class CentralDB:
                     """,
                     (user_id, user_id)
                 )
-            return True
\ No newline at end of file
+            return True
+
+    def remove_all_user_locations(self, user_id: int) -> int:
+        """Удаляет все локации пользователя одним запросом. Возвращает число удалённых."""
+        with self._get_connection() as conn:
+            return conn.execute(
+                "DELETE FROM user_locations WHERE user_id = ?",
+                (user_id,)
+            ).rowcount
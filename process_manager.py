@@ -12,7 +12,6 @@ import logging
 from config.bot_config import BotConfig
 from core.utils.validator import sanitize_user_input
 from core.db.central_db import CentralDB  # ← НОВОЕ
-from config.db_config import CENTRAL_DB_PATH  # ← для явного указания пути (опционально)
 from config.logging_config import setup_logging 
 class ProcessManager:
     """
@@ -38,7 +37,7 @@ class ProcessManager:
         self.config = BotConfig.load()
 
         # 2. Инициализация центральной БД
-        self.central_db = CentralDB(db_path=CENTRAL_DB_PATH)
+        self.central_db = CentralDB()  # путь берётся из db_config.CENTRAL_DB_PATH при создании
 
         self._initialized = True
         print("✅ ProcessManager: initialized (central_db ready)")
@@ -48,8 +47,8 @@ class ProcessManager:
         if not self._initialized:
             return
 
-        # Центральная БД SQLite не требует явного закрытия (соединения локальные),
-        # но можно добавить логику очистки, если потребуется.
+        # Закрываем подключения центральной БД (по одному на поток)
+        self.central_db.shutdown()
         print("🛑 Processanager: shut down")
 
 # Глобальный экземпляр — точка доступа для всех модулей
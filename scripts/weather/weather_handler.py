@@ -54,8 +54,7 @@ async def weather_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         location_id = data.split(":", 1)[1]
         user_id = update.effective_user.id
         db = process_manager.central_db
-        locations = db.get_user_locations(user_id)
-        loc = next((l for l in locations if l["location_id"] == location_id), None)
+        loc = db.get_location(user_id, location_id)
         
         if loc:
             await show_weather_forecast(update, context, location_id, loc["display_name"])
@@ -139,39 +139,12 @@ STRUCTURE = {
 }
 
 # Папки, которые не являются Python-пакетами
-NON_PACKAGE_DIRS = {"logs", "data", "temp", "docs"}
+NON_PACKAGE_DIRS = frozenset({"logs", "data", "temp", "docs"})
 
-def create_structure(base_path: Path, structure: dict):
-    """Рекурсивно создаёт структуру директорий и файлов"""
-    for name, content in structure.items():
-        if name == "__files__":
-            continue
+INIT_PAYLOAD = b'"""Init module."""\n'
 
-        path = base_path / name
-        path.mkdir(exist_ok=True)
-        print(f"📁 Создана папка: {path.relative_to(base_path)}")
-
-        # Добавляем __init__.py, если это Python-пакет
-        if name not in NON_PACKAGE_DIRS:
-            init_file = path / "__init__.py"
-            if not init_file.exists():
-                init_file.write_text('"""Init module."""\n', encoding="utf-8")
-                print(f"  📄 Создан: {init_file.relative_to(base_path)}")
-
-        # Рекурсивный вызов для вложенных папок
-        if isinstance(content, dict):
-            create_structure(path, content)
-
-    # Создание файлов на текущем уровне
-    files = structure.get("__files__", [])
-    for filename in files:
-        file_path = base_path / filename
-        if not file_path.exists():
-            if filename.endswith(".py"):
-                file_path.write_text('"""Module placeholder."""\n', encoding="utf-8")
-            elif filename == "requirements.txt":
-                # Обновлённый requirements.txt под Windows и python-telegram-bot
-                reqs = """# Core
+# Обновлённый requirements.txt под Windows и python-telegram-bot
+REQUIREMENTS_TXT = """# Core
 python-telegram-bot[httpx]==20.7
 httpx==0.27.0
 Jinja2==3.1.4
@@ -191,12 +164,71 @@ structlog==24.2.0
 pytest==8.3.2
 pytest-asyncio==0.23.7
 """
-                file_path.write_text(reqs, encoding="utf-8")
-            elif filename == "README.md":
-                file_path.write_text("# Meteorological Assistant Bot (Windows 10)\n\nSee docs/ for architecture.\n", encoding="utf-8")
-            else:
-                file_path.write_text("", encoding="utf-8")
-            print(f"📄 Создан файл: {file_path.relative_to(base_path)}")
+
+# Содержимое новых файлов: сначала по точному имени, затем по расширению
+PAYLOADS = {
+    "requirements.txt": REQUIREMENTS_TXT.encode("utf-8"),
+    "README.md": "# Meteorological Assistant Bot (Windows 10)\n\nSee docs/ for architecture.\n".encode("utf-8"),
+}
+SUFFIX_PAYLOADS = {
+    ".py": b'"""Module placeholder."""\n',
+}
+
+def file_payload(filename: str) -> bytes:
+    """Содержимое нового файла по его имени (сразу в байтах)."""
+    payload = PAYLOADS.get(filename)
+    if payload is None:
+        payload = SUFFIX_PAYLOADS.get(os.path.splitext(filename)[1], b"")
+    return payload
+
+def flatten_structure(structure: dict):
+    """
+    Разворачивает дерево STRUCTURE обходом в глубину с явным стеком.
+    Возвращает (папки, файлы): пути относительно корня проекта; файлы — вместе
+    с содержимым. __init__.py пакета идёт раньше файлов из его "__files__".
+    """
+    dirs = []
+    files = []
+    stack = [("", structure)]
+    while stack:
+        prefix, node = stack.pop()
+        children = []
+        for name, content in node.items():
+            if name == "__files__":
+                continue
+            path = os.path.join(prefix, name)
+            dirs.append(path)
+            # Добавляем __init__.py, если это Python-пакет
+            if name not in NON_PACKAGE_DIRS:
+                files.append((os.path.join(path, "__init__.py"), INIT_PAYLOAD))
+            if isinstance(content, dict):
+                children.append((path, content))
+
+        # Файлы текущего уровня
+        for filename in node.get("__files__", []):
+            files.append((os.path.join(prefix, filename), file_payload(filename)))
+
+        # В обратном порядке, чтобы папки обходились в порядке объявления
+        stack.extend(reversed(children))
+    return dirs, files
+
+# Плоские списки строятся один раз при импорте
+ALL_DIRS, ALL_FILES = flatten_structure(STRUCTURE)
+
+def create_structure(base_path: Path):
+    """Создаёт директории и файлы из ALL_DIRS / ALL_FILES"""
+    for rel_dir in ALL_DIRS:
+        os.makedirs(os.path.join(base_path, rel_dir), exist_ok=True)
+        print(f"📁 Создана папка: {rel_dir}")
+
+    for rel_path, payload in ALL_FILES:
+        # "x" — атомарное создание: один open вместо exists + open
+        try:
+            with open(os.path.join(base_path, rel_path), "xb") as f:
+                f.write(payload)
+        except FileExistsError:
+            continue
+        print(f"📄 Создан файл: {rel_path}")
 
 def create_documentation(base_path: Path):
     """Создаёт STRUCTURE.md с обновлённой архитектурой"""
@@ -252,9 +284,12 @@ config/secrets.py
 Thumbs.db
 """
     gitignore_path = base_path / ".gitignore"
-    if not gitignore_path.exists():
-        gitignore_path.write_text(gitignore_content, encoding="utf-8")
-        print(f"📄 Создан .gitignore")
+    try:
+        with open(gitignore_path, "x", encoding="utf-8") as f:
+            f.write(gitignore_content)
+    except FileExistsError:
+        return
+    print(f"📄 Создан .gitignore")
 
 def main():
     project_root = Path.cwd()
@@ -267,7 +302,7 @@ def main():
         print(f"📁 Создана папка: {folder}")
 
     # Создаём структуру
-    create_structure(project_root, STRUCTURE)
+    create_structure(project_root)
 
     # Дополнительные файлы
     create_documentation(project_root)
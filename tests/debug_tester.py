@@ -7,11 +7,11 @@
 import sqlite3
 from pathlib import Path
 from core.db.central_db import CentralDB
-from config.db_config import CENTRAL_DB_PATH
+from config import db_config
 
 def reset_user_data(user_id: int):
     """Полная очистка данных пользователя для чистого теста."""
-    with sqlite3.connect(CENTRAL_DB_PATH) as conn:
+    with sqlite3.connect(db_config.CENTRAL_DB_PATH) as conn:
         conn.execute("DELETE FROM user_locations WHERE user_id = ?", (user_id,))
         conn.execute("DELETE FROM users WHERE telegram_id = ?", (user_id,))
 
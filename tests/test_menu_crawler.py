@@ -6,11 +6,9 @@
 
 import logging
 from core.db.central_db import CentralDB
-from process_manager import process_manager
 
-# Инициализация
-process_manager.initialize_sync()
-db = process_manager.central_db
+# Инициализация: общая БД в памяти — без записи на диск и без порчи рабочей central.db
+db = CentralDB(db_path="file:menu_crawler?mode=memory&cache=shared")
 
 logging.basicConfig(
     level=logging.INFO,
@@ -24,13 +22,9 @@ class BusinessLogicCrawler:
         self.errors = []
 
     def reset_user(self):
-        """Полная очистка данных пользователя через прямой SQL."""
+        """Полная очистка локаций пользователя."""
         try:
-            with sqlite3.connect(process_manager.central_db.db_path) as conn:
-                # Удаляем все локации пользователя
-                conn.execute("DELETE FROM user_locations WHERE user_id = ?", (self.user_id,))
-                # Удаляем самого пользователя (если нужно)
-                conn.execute("DELETE FROM users WHERE telegram_id = ?", (self.user_id,))
+            db.remove_all_user_locations(self.user_id)
         except Exception as e:
             logging.warning(f"⚠️ Очистка пользователя {self.user_id} вызвала: {e}")
     def log_step(self, action: str, status: str = "ok"):
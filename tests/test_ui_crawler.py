@@ -1,9 +1,11 @@
 # tests/test_fuzz_crawler.py
 import random
 import logging
+import sys
+import tempfile
 import uuid
 from datetime import datetime
-from process_manager import process_manager
+from pathlib import Path
 from core.db.central_db import CentralDB
 
 # Настройка логирования
@@ -12,8 +14,16 @@ logging.basicConfig(
     format="%(asctime)s | %(levelname)-8s | %(message)s"
 )
 
+def scratch_db_path() -> Path:
+    """Путь к временной БД: на tmpfs (/dev/shm), если есть, иначе во временной папке."""
+    shm = Path("/dev/shm")
+    base = shm if shm.is_dir() else Path(tempfile.gettempdir())
+    return base / f"central_{uuid.uuid4().hex}.db"
+
 def dump_user_state(db, user_id: int, step: int = None):
-    """Дамп всех локаций пользователя для диагностики."""
+    """Дамп всех локаций пользователя для диагностики (только при включённом INFO)."""
+    if not logging.getLogger().isEnabledFor(logging.INFO):
+        return []
     try:
         locations = db.get_user_locations(user_id)
         if step is not None:
@@ -57,18 +67,20 @@ def test_edge_cases(db, user_id: int):
     logging.info("  ✅ Добавление в пустое состояние — OK")
 
     # Очистка
-    for loc in locs:
-        db.remove_location(user_id, loc["location_id"])
+    db.remove_all_user_locations(user_id)
     logging.info("  ✅ Крайние случаи пройдены")
 
 def test_random_actions(db, user_id: int, test_id: str, max_steps: int = 100):
-    """Fuzz-тест с расширенным набором действий."""
+    """Fuzz-тест с расширенным набором действий. test_id служит зерном ГПСЧ.
+    Команду повтора прогона печатает run_stress_test."""
+    rng = random.Random(test_id)  # своё зерно — прогон воспроизводим по test_id
     location_ids = []
+    idx = {}  # location_id → позиция в location_ids (для удаления за O(1))
     actions = ["add_geo", "add_text", "set_default", "delete", "delete_all"]
 
-    for step in range(max_steps):
-        action = random.choice(actions)
-        current_locations = db.get_user_locations(user_id)
+    planned_actions = rng.choices(actions, k=max_steps)
+
+    for step, action in enumerate(planned_actions):
         action_details = {"type": action, "location_id": None}
 
         try:
@@ -76,19 +88,20 @@ def test_random_actions(db, user_id: int, test_id: str, max_steps: int = 100):
                 is_geo = (action == "add_geo")
                 loc_id = f"{'geo' if is_geo else 'text'}_{test_id}_{step}"
                 display_name = f"{'Гео' if is_geo else 'Текст'}-{step}"
-                is_default = len(current_locations) == 0
+                is_default = db.count_locations(user_id) == 0
                 lat, lon = (55.0 + step*0.01, 37.0) if is_geo else (0.0, 0.0)
                 db.add_location(user_id, loc_id, display_name, lat, lon, is_default=is_default)
+                idx[loc_id] = len(location_ids)
                 location_ids.append(loc_id)
                 logging.info(f"✅ [Шаг {step}] Добавлена {'гео' if is_geo else 'текстовая'} локация: {display_name} (по умолчанию: {is_default})")
 
             elif action == "set_default":
                 if location_ids:
-                    target_id = random.choice(location_ids)
+                    target_id = rng.choice(location_ids)
                     success = db.set_default_location(user_id, target_id)
                     if not success:
                         # Проверяем, существует ли локация
-                        exists = any(loc["location_id"] == target_id for loc in current_locations)
+                        exists = db.get_location(user_id, target_id) is not None
                         if not exists:
                             logging.warning(f"⚠️ [Шаг {step}] Локация {target_id} отсутствует")
                         else:
@@ -98,27 +111,35 @@ def test_random_actions(db, user_id: int, test_id: str, max_steps: int = 100):
 
             elif action == "delete":
                 if location_ids:
-                    target_id = random.choice(location_ids)
+                    target_id = rng.choice(location_ids)
                     db.remove_location(user_id, target_id)
-                    if target_id in location_ids:
-                        location_ids.remove(target_id)
+                    # swap-and-pop: на место удалённого ставим последний элемент
+                    i = idx.pop(target_id)
+                    last = location_ids.pop()
+                    if i < len(location_ids):
+                        location_ids[i] = last
+                        idx[last] = i
                     logging.info(f"✅ [Шаг {step}] Удалена локация: ID {target_id}")
 
             elif action == "delete_all":
-                # Удаляем все локации
-                for loc_id in location_ids[:]:
-                    db.remove_location(user_id, loc_id)
+                # Удаляем все локации одним запросом
+                db.remove_all_user_locations(user_id)
                 location_ids.clear()
+                idx.clear()
                 logging.info(f"🧹 [Шаг {step}] Удалены все локации")
 
             # === Проверка инварианта ===
-            locations = dump_user_state(db, user_id, step)
-            defaults = [l for l in locations if l["is_default"]]
-            
-            if locations and len(defaults) != 1:
+            total = db.count_locations(user_id)
+            n_defaults = db.count_defaults(user_id)
+            # Поштучный дамп на каждом шаге — только в DEBUG; при ошибке дамп делается ниже
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                dump_user_state(db, user_id, step)
+
+            if total and n_defaults != 1:
                 logging.error(f"❌ ТУПИК НА ШАГЕ {step} [ID: {test_id}]")
                 logging.error(f"  Действие: {action_details}")
-                logging.error(f"  Обнаружено локаций по умолчанию: {len(defaults)} (ожидалось 1)")
+                logging.error(f"  Обнаружено локаций по умолчанию: {n_defaults} (ожидалось 1)")
+                dump_user_state(db, user_id)
                 return False
 
         except Exception as e:
@@ -128,51 +149,61 @@ def test_random_actions(db, user_id: int, test_id: str, max_steps: int = 100):
 
     return True
 
-def run_stress_test():
-    """Запуск стресс-теста и крайних случаев."""
-    test_id = str(uuid.uuid4())[:8]
+def run_stress_test(test_id: str = None):
+    """Запуск стресс-теста и крайних случаев. Передайте test_id, чтобы повторить прогон."""
+    test_id = test_id or str(uuid.uuid4())[:8]
     logging.info(f"🔥 Запуск стресс-теста [ID: {test_id}]")
+    replay_hint = f"  Повтор прогона (из корня проекта): python -m tests.test_ui_crawler {test_id}"
     
-    process_manager.initialize_sync()
-    db = process_manager.central_db
+    # Отдельная временная БД на tmpfs: рабочая central.db не трогается, fsync не идёт на диск
+    db_path = scratch_db_path()
+    db = None
     user_id = 999999999
 
-    # Очистка
     try:
-        locations = db.get_user_locations(user_id)
-        for loc in locations:
-            db.remove_location(user_id, loc["location_id"])
-    except Exception as e:
-        logging.warning(f"⚠️ Очистка вызвала: {e}")
-
-    start_time = datetime.now()
+        db = CentralDB(db_path=db_path)
+        # WAL + synchronous=OFF: БД одноразовая, гарантии при сбое не нужны
+        # (важно для запасного пути во временной папке на диске, где нет tmpfs)
+        db.enable_fast_writes(synchronous="OFF")
 
-    # 1. Тест крайних случаев
-    try:
-        test_edge_cases(db, user_id)
-    except Exception as e:
-        logging.exception("❌ Крайние случаи не пройдены:")
-        return False
+        start_time = datetime.now()
 
-    # 2. Fuzz-тест с 100 шагами
-    if not test_random_actions(db, user_id, test_id, max_steps=100):
-        return False
+        # 1. Тест крайних случаев
+        try:
+            test_edge_cases(db, user_id)
+        except Exception as e:
+            logging.exception("❌ Крайние случаи не пройдены:")
+            logging.error(replay_hint)
+            return False
 
-    # 3. Дополнительный стресс: 10 быстрых операций подряд
-    for i in range(10):
-        db.add_location(user_id, f"stress_{i}", f"Стресс-{i}", 0, 0, is_default=False)
-    locs = db.get_user_locations(user_id)
-    if len(locs) != 10:
-        logging.error("❌ Стресс-тест: не все локации добавлены")
-        return False
-    logging.info("✅ Стресс-тест: быстрые операции — OK")
+        # 2. Fuzz-тест с 100 шагами
+        if not test_random_actions(db, user_id, test_id, max_steps=100):
+            logging.error(replay_hint)
+            return False
 
-    duration = datetime.now() - start_time
-    logging.info(f"✅ Стресс-тест [ID: {test_id}] пройден успешно за {duration}")
-    return True
+        # 3. Дополнительный стресс: 10 быстрых операций подряд
+        # (fuzz-прогон может оставить локации — начинаем с пустого списка)
+        db.remove_all_user_locations(user_id)
+        db.add_locations_bulk(user_id, [(f"stress_{i}", f"Стресс-{i}", 0, 0) for i in range(10)])
+        locs = db.get_user_locations(user_id)
+        if len(locs) != 10:
+            logging.error("❌ Стресс-тест: не все локации добавлены")
+            logging.error(replay_hint)
+            return False
+        logging.info("✅ Стресс-тест: быстрые операции — OK")
+
+        duration = datetime.now() - start_time
+        logging.info(f"✅ Стресс-тест [ID: {test_id}] пройден успешно за {duration}")
+        return True
+    finally:
+        # Файлы удаляются, даже если БД не удалось создать или настроить
+        if db is not None:
+            db.shutdown()
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{db_path}{suffix}").unlink(missing_ok=True)
 
 if __name__ == "__main__":
-    if run_stress_test():
+    if run_stress_test(sys.argv[1] if len(sys.argv) > 1 else None):
         exit(0)
     else:
         exit(1)
\ No newline at end of file